@@ -1,37 +1,94 @@
 from __future__ import annotations
 
+from collections import Counter
+from collections.abc import Sequence
 import logging
 from pathlib import Path
-import shutil
-from typing import Literal
 
 import click
+from tqdm import tqdm
 
-from image_organizer.filesystem import is_image, mkdirp
-from image_organizer.func import map_mt_with_tqdm
-from image_organizer.hash import compute_hash
+from image_organizer.filesystem import ImageIndex, copyfile, index_images_parallel, mkdirp_many
+from image_organizer.func import map_mp_with_tqdm, map_mt_with_tqdm
+from image_organizer.hash import DEFAULT_CHUNK_SIZE, HashMethod, check_hash_method, compute_hash, compute_hash_chunked
 from image_organizer.logger import set_logger_level
 
 __all__ = ['compare_image_content']
 
 def _copyfile(src_dst: tuple[Path, Path]):
     src, dst = src_dst
-    return shutil.copyfile(src, dst)
+    return copyfile(src, dst)
+
+def _compute_hash(path_hasher: tuple[Path, HashMethod]):
+    path, hasher = path_hasher
+    return compute_hash(path, hash_method=hasher)
+
+def _check_hasher(ctx: click.Context, param: click.Parameter, value: HashMethod) -> HashMethod:
+    try:
+        check_hash_method(value)
+    except ImportError as e:
+        raise click.BadParameter(str(e), ctx=ctx, param=param) from e
+
+    return value
+
+def _get_idxs_to_hash(img_index: ImageIndex, *, other_img_index: ImageIndex) -> list[int]:
+    # Images with different sizes cannot have the same content, so an image only needs
+    # to be hashed if another image (from either set) has the same size as it
+    other_img_sizes = set(other_img_index.sizes)
+    img_size_counts = Counter(img_index.sizes)
+
+    return [
+        i for i, img_size in enumerate(img_index.sizes)
+        if img_size in other_img_sizes or img_size_counts[img_size] > 1
+    ]
+
+def _hash_images(imgs_to_hash: Sequence[tuple[ImageIndex, int]], *, hasher: HashMethod, threads: int) -> None:
+    # Files that are large enough to keep every thread busy on their own are split into chunks
+    # which are hashed in parallel. Since this depends only on the file size (which is part of
+    # the key), files that may have the same content are always hashed in the same way
+    is_large = [img_index.sizes[i] > DEFAULT_CHUNK_SIZE * threads for img_index, i in imgs_to_hash]
+    imgs_to_hash_per_file = [img for img, large in zip(imgs_to_hash, is_large) if not large]
+    imgs_to_hash_per_chunk = [img for img, large in zip(imgs_to_hash, is_large) if large]
+
+    # All worker processes are created before `compute_hash_chunked` starts any threads,
+    # since forking a multithreaded process may cause deadlocks
+    img_hashes = map_mp_with_tqdm(
+        [(img_index.paths[i], hasher) for img_index, i in imgs_to_hash_per_file],
+        _compute_hash,
+        n_jobs=threads,
+        desc='Hashing images',
+    )
+    for (img_index, i), img_hash in zip(imgs_to_hash_per_file, img_hashes):
+        img_index.hashes[i] = img_hash
+
+    if imgs_to_hash_per_chunk:
+        for img_index, i in tqdm(imgs_to_hash_per_chunk, desc='Hashing images (large files)'):
+            img_index.hashes[i] = compute_hash_chunked(img_index.paths[i], hash_method=hasher, n_jobs=threads)
+
+def _get_img_key_to_idx(img_index: ImageIndex) -> dict[object, int]:
+    return {
+        # An image that has not been (or cannot be) hashed cannot match any other image,
+        # so it is given a unique key
+        (img_size, img_hash) if img_hash is not None else object(): i
+        for i, (img_size, img_hash) in enumerate(zip(img_index.sizes, img_index.hashes))
+    }
 
 @click.command()
 @click.argument('src1', type=click.Path(exists=True, file_okay=False, dir_okay=True))
 @click.argument('src2', type=click.Path(exists=True, file_okay=False, dir_okay=True))
 @click.argument('dst', type=click.Path(exists=False))
-@click.option('--hasher', '-h', type=click.Choice(['sha256', 'sha512']), default='sha256',
-              help='The algorithm used to hash each file. (Default: sha256)')
+@click.option('--hasher', '-h', type=click.Choice(['sha256', 'sha512', 'blake3']), default='sha256',
+              callback=_check_hasher,
+              help='The algorithm used to hash each file. '
+                   '`blake3` requires the `blake3` package to be installed. (Default: sha256)')
 @click.option('--threads', '-t', type=click.IntRange(min=1), default=8,
-              help='Number of threads to use in parallel for I/O operations. (Default: 8)')
+              help='Number of threads (or processes, when hashing) to use in parallel. (Default: 8)')
 def compare_image_content(
     src1: str,
     src2: str,
     dst: str,
     *,
-    hasher: Literal['sha256', 'sha512'],
+    hasher: HashMethod,
     threads: int,
 ):
     """
@@ -56,46 +113,43 @@ def compare_image_content(
 
     set_logger_level(logging.INFO)
 
-    src1_img_paths = [path for path in Path(src1).rglob('*') if is_image(path)]
-    src1_img_hashes = map_mt_with_tqdm(
-        src1_img_paths,
-        lambda path: compute_hash(path, hash_method=hasher),
-        n_jobs=threads,
-        desc='Hashing images from src1',
-    )
-    src1_img_hash_to_path = {
-        img_hash: img_path
-        for img_path, img_hash in zip(src1_img_paths, src1_img_hashes)
-    }
+    src1_img_index = index_images_parallel(Path(src1), n_jobs=threads)
+    src2_img_index = index_images_parallel(Path(src2), n_jobs=threads)
 
-    src2_img_paths = [path for path in Path(src2).rglob('*') if is_image(path)]
-    src2_img_hashes = map_mt_with_tqdm(
-        src2_img_paths,
-        lambda path: compute_hash(path, hash_method=hasher),
-        n_jobs=threads,
-        desc='Hashing images from src2',
+    _hash_images(
+        [(src1_img_index, i) for i in _get_idxs_to_hash(src1_img_index, other_img_index=src2_img_index)]
+        + [(src2_img_index, i) for i in _get_idxs_to_hash(src2_img_index, other_img_index=src1_img_index)],
+        hasher=hasher,
+        threads=threads,
     )
-    src2_img_hash_to_path = {
-        img_hash: img_path
-        for img_path, img_hash in zip(src2_img_paths, src2_img_hashes)
-    }
 
-    hashes_in_src1 = set(src1_img_hashes)
-    hashes_in_src2 = set(src2_img_hashes)
-    hashes_in_both = hashes_in_src1 & hashes_in_src2
-    hashes_in_src1_only = hashes_in_src1 - hashes_in_src2
-    hashes_in_src2_only = hashes_in_src2 - hashes_in_src1
+    src1_img_key_to_idx = _get_img_key_to_idx(src1_img_index)
+    src2_img_key_to_idx = _get_img_key_to_idx(src2_img_index)
 
     in_both_src_path_to_dst_path = {
-        src1_img_hash_to_path[img_hash]: Path(dst) / 'both' / src1_img_hash_to_path[img_hash].relative_to(src1)
-        for img_hash in hashes_in_both
+        src1_img_index.paths[i]: Path(dst) / 'both' / src1_img_index.rel_paths[i]
+        for img_key, i in src1_img_key_to_idx.items()
+        if img_key in src2_img_key_to_idx
+    }
+    in_src1_only_src_path_to_dst_path = {
+        src1_img_index.paths[i]: Path(dst) / 'src1_only' / src1_img_index.rel_paths[i]
+        for img_key, i in src1_img_key_to_idx.items()
+        if img_key not in src2_img_key_to_idx
+    }
+    in_src2_only_src_path_to_dst_path = {
+        src2_img_index.paths[i]: Path(dst) / 'src2_only' / src2_img_index.rel_paths[i]
+        for img_key, i in src2_img_key_to_idx.items()
+        if img_key not in src1_img_key_to_idx
     }
 
-    map_mt_with_tqdm(
-        {path.parent for path in in_both_src_path_to_dst_path.values()},
-        mkdirp,
-        n_jobs=threads,
-        desc='Creating output directories for images that exist in both',
+    mkdirp_many(
+        path.parent
+        for src_path_to_dst_path in (
+            in_both_src_path_to_dst_path,
+            in_src1_only_src_path_to_dst_path,
+            in_src2_only_src_path_to_dst_path,
+        )
+        for path in src_path_to_dst_path.values()
     )
 
     map_mt_with_tqdm(
@@ -105,18 +159,6 @@ def compare_image_content(
         desc='Writing output images that exist in both',
     )
 
-    in_src1_only_src_path_to_dst_path = {
-        src1_img_hash_to_path[img_hash]: Path(dst) / 'src1_only' / src1_img_hash_to_path[img_hash].relative_to(src1)
-        for img_hash in hashes_in_src1_only
-    }
-
-    map_mt_with_tqdm(
-        {path.parent for path in in_src1_only_src_path_to_dst_path.values()},
-        mkdirp,
-        n_jobs=threads,
-        desc='Creating output directories for images that exist in src1 only',
-    )
-
     map_mt_with_tqdm(
         in_src1_only_src_path_to_dst_path.items(),
         _copyfile,
@@ -124,18 +166,6 @@ def compare_image_content(
         desc='Writing output images that exist in src1 only',
     )
 
-    in_src2_only_src_path_to_dst_path = {
-        src2_img_hash_to_path[img_hash]: Path(dst) / 'src2_only' / src2_img_hash_to_path[img_hash].relative_to(src2)
-        for img_hash in hashes_in_src2_only
-    }
-
-    map_mt_with_tqdm(
-        {path.parent for path in in_src2_only_src_path_to_dst_path.values()},
-        mkdirp,
-        n_jobs=threads,
-        desc='Creating output directories for images that exist in src2 only',
-    )
-
     map_mt_with_tqdm(
         in_src2_only_src_path_to_dst_path.items(),
         _copyfile,
@@ -143,6 +173,5 @@ def compare_image_content(
         desc='Writing output images that exist in src2 only',
     )
 
-
 if __name__ == '__main__':
     compare_image_content()
@@ -4,14 +4,13 @@ from collections import defaultdict
 from datetime import datetime
 import logging
 from pathlib import Path
-import shutil
-from typing import Literal
+from typing import Callable, Literal
 
 import click
 from tqdm import tqdm
 
 from image_organizer.exif import read_captured_timestamp
-from image_organizer.filesystem import is_image, mkdirp
+from image_organizer.filesystem import copyfile, iter_images_parallel, mkdirp_many
 from image_organizer.func import map_mt_with_tqdm
 from image_organizer.logger import set_logger_level
 
@@ -19,15 +18,13 @@ __all__ = ['groupby_captured_timestamp']
 
 def _copyfile(src_dst: tuple[Path, Path]):
     src, dst = src_dst
-    return shutil.copyfile(src, dst)
+    return copyfile(src, dst)
 
-def _get_dst_dir_name(timestamp: datetime, *, groupby: Literal['year', 'month', 'day']) -> str:
-    if groupby == 'year':
-        return timestamp.strftime(r'%Y')
-    elif groupby == 'month':
-        return timestamp.strftime(r'%Y%m')
-    elif groupby == 'day':
-        return timestamp.strftime(r'%Y%m%d')
+_GROUPBY_TO_DST_DIR_NAME_FN: dict[str, Callable[[datetime], str]] = {
+    'year': lambda timestamp: f'{timestamp.year:04d}',
+    'month': lambda timestamp: f'{timestamp.year:04d}{timestamp.month:02d}',
+    'day': lambda timestamp: f'{timestamp.year:04d}{timestamp.month:02d}{timestamp.day:02d}',
+}
 
 @click.command()
 @click.argument('src', type=click.Path(exists=True, file_okay=False, dir_okay=True))
@@ -62,7 +59,7 @@ def groupby_captured_timestamp(
 
     set_logger_level(logging.INFO)
 
-    src_img_paths = [path for path in Path(src).rglob('*') if is_image(path)]
+    src_img_paths = sorted(iter_images_parallel(Path(src), n_jobs=threads))
     src_img_captured_timestamps = map_mt_with_tqdm(
         src_img_paths,
         read_captured_timestamp,
@@ -70,6 +67,8 @@ def groupby_captured_timestamp(
         desc='Reading metadata of images',
     )
 
+    get_dst_dir_name = _GROUPBY_TO_DST_DIR_NAME_FN[groupby]
+
     dst_dir_name_to_src_img_paths: defaultdict[str, list[Path]] = defaultdict(list)
     for src_img_path, captured_timestamp in tqdm(
         zip(src_img_paths, src_img_captured_timestamps),
@@ -79,7 +78,7 @@ def groupby_captured_timestamp(
         if captured_timestamp is None:
             dst_dir_name = 'UNKNOWN'
         else:
-            dst_dir_name = _get_dst_dir_name(captured_timestamp, groupby=groupby)
+            dst_dir_name = get_dst_dir_name(captured_timestamp)
 
         dst_dir_name_to_src_img_paths[dst_dir_name].append(src_img_path)
 
@@ -89,12 +88,7 @@ def groupby_captured_timestamp(
         for src_img_path in src_img_paths
     }
 
-    map_mt_with_tqdm(
-        {path.parent for path in src_img_path_to_dst_img_path.values()},
-        mkdirp,
-        n_jobs=threads,
-        desc='Creating output directories',
-    )
+    mkdirp_many(path.parent for path in src_img_path_to_dst_img_path.values())
 
     map_mt_with_tqdm(
         src_img_path_to_dst_img_path.items(),
@@ -3,6 +3,9 @@ from __future__ import annotations
 from collections.abc import Mapping
 from datetime import datetime
 from pathlib import Path
+import re
+import struct
+from typing import BinaryIO
 
 import exifread
 from PIL import ExifTags, Image, UnidentifiedImageError
@@ -13,10 +16,105 @@ __all__ = ['read_exif_tags', 'read_captured_timestamp']
 
 logger = get_logger()
 
+# Equivalent to `datetime.strptime` with format `%Y:%m:%d %H:%M:%S`, but much faster
+# (as in `strptime`, the space matches any run of whitespace and the day may be padded with a space)
+_EXIF_DATETIME_PATTERN = re.compile(r'(\d{4}):(\d{1,2}):(\d{1,2}| \d)\s+(\d{1,2}):(\d{1,2}):(\d{1,2})')
+
+# Image formats that can store EXIF tags (PNG via the `eXIf` chunk, which PIL also reads)
+_EXIF_BEARING_SUFFIXES = frozenset({
+    '.jpg', '.jpeg', '.jpe', '.jfif',
+    '.tif', '.tiff',
+    '.heic', '.heif', '.avif', '.webp', '.png', '.jxl',
+    '.dng', '.nef', '.cr2', '.arw', '.orf',
+})
+
+_JPEG_SOI = b'\xff\xd8'
+_JPEG_SOS, _JPEG_EOI, _JPEG_APP1 = 0xDA, 0xD9, 0xE1
+_EXIF_HEADER = b'Exif\x00\x00'
+
+def _read_jpeg_exif_segment(f: BinaryIO) -> bytes | None:
+    """
+    Walks the markers at the start of a JPEG file to find the EXIF data (APP1 segment),
+    without decoding anything else.
+
+    Returns `None` if the file is not a well-formed JPEG file, or an empty string
+    if the file does not contain any EXIF data.
+    """
+    if f.read(2) != _JPEG_SOI:
+        return None
+
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+
+        marker_type = marker[1]
+        # Any number of fill bytes may precede the marker type
+        while marker_type == 0xFF:
+            next_byte = f.read(1)
+            if not next_byte:
+                return None
+
+            marker_type = next_byte[0]
+
+        # The metadata segments all come before the image data
+        if marker_type in (_JPEG_SOS, _JPEG_EOI):
+            return b''
+        # Standalone markers without a length field
+        if marker_type == 0x01 or 0xD0 <= marker_type <= 0xD7:
+            continue
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+
+        length, = struct.unpack('>H', length_bytes)
+        if length < 2:
+            return None
+
+        if marker_type == _JPEG_APP1:
+            segment = f.read(length - 2)
+            # APP1 is also used for XMP data
+            if segment.startswith(_EXIF_HEADER):
+                return segment
+        else:
+            f.seek(length - 2, 1)
+
+def _read_exif_fast(img_path: Path) -> Mapping[int, object] | None:
+    """
+    Reads the EXIF tags stored in a JPEG file without going through :func:`Image.open`.
+
+    Returns `None` if the file is not a well-formed JPEG file.
+    """
+    with img_path.open('rb') as f:
+        segment = _read_jpeg_exif_segment(f)
+
+    if segment is None:
+        return None
+
+    exif = Image.Exif()
+    if segment:
+        exif.load(segment)
+
+    return exif
+
 def read_exif_tags(img_path: Path) -> Mapping[int, object]:
     """
     Reads the EXIF tags stored in an image file.
     """
+    # Avoid opening files that cannot contain EXIF tags in the first place
+    if img_path.suffix.lower() not in _EXIF_BEARING_SUFFIXES:
+        return {}
+
+    try:
+        exif_tags = _read_exif_fast(img_path)
+    except Exception:
+        # Let the slow path handle the error
+        exif_tags = None
+
+    if exif_tags is not None:
+        return exif_tags
+
     try:
         with Image.open(img_path) as img:
             return img.getexif()
@@ -58,10 +156,15 @@ def _try_parse_exif_datetime(exif_tags: Mapping[int, object], tag_key: int, *, i
         logger.info('Image (%s) has invalid datetime format for tag %s. Reason: Not a string.', img_path, tag_key)
         return None
 
+    match = _EXIF_DATETIME_PATTERN.fullmatch(tag_value)
+    if match is None:
+        logger.info('Image (%s) has invalid datetime format for tag %s. Reason: Not in "YYYY:MM:DD HH:MM:SS" form.', img_path, tag_key)
+        return None
+
     try:
-        return datetime.strptime(tag_value, r'%Y:%m:%d %H:%M:%S')
+        return datetime(*map(int, match.groups()))
     except ValueError:
-        logger.info('Image (%s) has invalid datetime format for tag %s. Reason: Not in "YYYY:MM:DD HH:MM:SS" form.', img_path, tag_key)
+        logger.info('Image (%s) has invalid datetime format for tag %s. Reason: Out of range.', img_path, tag_key)
         return None
 
 def read_captured_timestamp(img_path: Path) -> datetime | None:
@@ -1,16 +1,151 @@
 from __future__ import annotations
 
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+import errno
 import mimetypes
+import os
 from pathlib import Path
+import queue
+import shutil
+import sys
+import threading
+from typing import Callable, TypeVar
 
-__all__ = ['is_image', 'mkdirp']
+from .logger import get_logger
+
+if sys.platform == 'linux':
+    import fcntl
+
+__all__ = [
+    'IMG_SUFFIXES', 'is_image',
+    'ImageIndex', 'index_images_parallel', 'iter_images_parallel',
+    'mkdirp', 'mkdirp_many', 'copyfile',
+]
+
+logger = get_logger()
+
+T = TypeVar('T')
+
+mimetypes.init()
+
+IMG_SUFFIXES = frozenset(
+    suffix.lower()
+    for suffix, filetype in mimetypes.types_map.items()
+    if filetype.startswith('image/')
+)
+"""The (lowercase) file extensions that correspond to image MIME types."""
 
 def is_image(path: Path) -> bool:
     """
-    Tests if a file is an image or not.
+    Tests if a file is an image or not, based on its file extension.
+    """
+    return path.suffix.lower() in IMG_SUFFIXES
+
+def _scan_images_parallel(root: Path, fn: Callable[[os.DirEntry[str]], T], *, n_jobs: int) -> Iterator[T]:
+    dir_queue: queue.Queue[str | None] = queue.Queue()
+    result_queue: queue.Queue[object] = queue.Queue()
+    done = object()
+
+    def scan_dirs():
+        while True:
+            dir_path = dir_queue.get()
+            if dir_path is None:
+                return
+
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        # The file type is usually cached by `scandir` so no extra system call is needed
+                        if entry.is_dir(follow_symlinks=False):
+                            # Keep the raw string (rather than converting it into `Path`)
+                            # so that the paths of all entries start with `root` verbatim
+                            dir_queue.put(entry.path)
+                        elif entry.is_file() and is_image(Path(entry.path)):
+                            try:
+                                result_queue.put(fn(entry))
+                            except OSError:
+                                logger.warning('File (%s) cannot be read.', entry.path, exc_info=True)
+            except OSError:
+                logger.warning('Directory (%s) cannot be read.', dir_path, exc_info=True)
+            finally:
+                dir_queue.task_done()
+
+    def stop_when_done():
+        # All directories have been scanned once every queued directory has been processed
+        dir_queue.join()
+
+        for _ in range(n_jobs):
+            dir_queue.put(None)
+        result_queue.put(done)
+
+    threads = [threading.Thread(target=scan_dirs, daemon=True) for _ in range(n_jobs)]
+    threads.append(threading.Thread(target=stop_when_done, daemon=True))
+
+    dir_queue.put(os.fspath(root))
+    for thread in threads:
+        thread.start()
+
+    while True:
+        result = result_queue.get()
+        if result is done:
+            break
+
+        yield result  # type: ignore[misc]
+
+    # Make sure that no threads are left behind (e.g., before the process is forked)
+    for thread in threads:
+        thread.join()
+
+def iter_images_parallel(root: Path, *, n_jobs: int) -> Iterator[Path]:
+    """
+    Finds the images under a directory (including its subdirectories),
+    using multithreading to scan multiple directories at the same time.
+
+    Symbolic links to directories are not followed.
+    The images are yielded in no particular order.
+    """
+    return _scan_images_parallel(root, lambda entry: Path(entry.path), n_jobs=n_jobs)
+
+@dataclass
+class ImageIndex:
+    """
+    The images found under a directory, stored as parallel arrays
+    so that the `i`th element of each field describes the same image.
+    """
+    paths: list[Path]
+    """The path of each image, in sorted order."""
+    rel_paths: list[Path]
+    """The path of each image, relative to the directory that was scanned."""
+    sizes: array[int]
+    """The size (in bytes) of each image."""
+    hashes: list[bytes | None]
+    """The hash of each image, or `None` if it has not been hashed."""
+
+def index_images_parallel(root: Path, *, n_jobs: int) -> ImageIndex:
+    """
+    Builds an :class:`ImageIndex` of the images under a directory (including its subdirectories).
+    The images are not hashed yet.
+
+    See :func:`iter_images_parallel` for more details.
     """
-    filetype, _ = mimetypes.guess_type(path)
-    return filetype is not None and filetype.startswith('image/')
+    # The raw path of every entry starts with this prefix since it is found by scanning `root`,
+    # so there is no need to call `Path.relative_to`
+    root_prefix_len = len(os.path.join(root, ''))
+
+    paths_with_rel_paths_and_sizes = sorted(_scan_images_parallel(
+        root,
+        lambda entry: (Path(entry.path), Path(entry.path[root_prefix_len:]), entry.stat().st_size),
+        n_jobs=n_jobs,
+    ))
+
+    return ImageIndex(
+        paths=[path for path, _, _ in paths_with_rel_paths_and_sizes],
+        rel_paths=[rel_path for _, rel_path, _ in paths_with_rel_paths_and_sizes],
+        sizes=array('q', (size for _, _, size in paths_with_rel_paths_and_sizes)),
+        hashes=[None] * len(paths_with_rel_paths_and_sizes),
+    )
 
 def mkdirp(path: Path) -> None:
     """
@@ -18,3 +153,121 @@ def mkdirp(path: Path) -> None:
     along the way if necessary and allows existing directories.
     """
     return path.mkdir(parents=True, exist_ok=True)
+
+def mkdirp_many(paths: Iterable[Path]) -> None:
+    """
+    As :func:`mkdirp`, but for multiple directories at once.
+
+    Directories that are parents of other directories in `paths` are skipped
+    since they are created along the way anyway.
+    """
+    leaf_paths: list[Path] = []
+    # After sorting, each directory is immediately followed by its subdirectories (if any)
+    for path in sorted({Path(os.path.normpath(path)) for path in paths}):
+        if leaf_paths and leaf_paths[-1] in path.parents:
+            leaf_paths.pop()
+
+        leaf_paths.append(path)
+
+    for path in leaf_paths:
+        os.makedirs(path, exist_ok=True)
+
+# Errors indicating that a zero-copy system call is unavailable for the given pair of files,
+# as opposed to a genuine I/O error
+_ZERO_COPY_UNSUPPORTED_ERRNOS = frozenset({errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP, errno.ENOTSOCK})
+
+_FICLONE = 0x40049409  # From <linux/fs.h>
+
+def _reflink(in_fd: int, out_fd: int) -> bool:
+    if sys.platform != 'linux':
+        return False
+
+    try:
+        # Let the two files share the same data blocks (copy-on-write)
+        fcntl.ioctl(out_fd, _FICLONE, in_fd)
+    except OSError as e:
+        if e.errno in _ZERO_COPY_UNSUPPORTED_ERRNOS or e.errno == errno.ENOTTY:
+            return False
+        raise
+
+    return True
+
+# The number of bytes requested per system call is at least this many,
+# since some files (e.g. in procfs) report a size of zero even though they are not empty
+_MIN_BLOCK_SIZE = 8 << 20  # 8 MiB
+
+def _copy_file_range(in_fd: int, out_fd: int, size: int) -> bool:
+    if not hasattr(os, 'copy_file_range'):
+        return False
+
+    block_size = max(size, _MIN_BLOCK_SIZE)
+    offset = 0
+    # Copy until the end of the file instead of relying on the reported size
+    while True:
+        try:
+            n_copied = os.copy_file_range(in_fd, out_fd, block_size)
+        except OSError as e:
+            # Only fall back if nothing has been written yet
+            if offset == 0 and e.errno in _ZERO_COPY_UNSUPPORTED_ERRNOS:
+                return False
+            raise
+
+        if n_copied == 0:
+            # Some filesystems report nothing copied even though the file is not empty
+            if offset == 0:
+                return False
+            break
+        offset += n_copied
+
+    return True
+
+def _sendfile(in_fd: int, out_fd: int, size: int) -> bool:
+    if not hasattr(os, 'sendfile'):
+        return False
+
+    block_size = max(size, _MIN_BLOCK_SIZE)
+    offset = 0
+    # Copy until the end of the file instead of relying on the reported size
+    while True:
+        try:
+            n_sent = os.sendfile(out_fd, in_fd, offset, block_size)
+        except OSError as e:
+            # Only fall back if nothing has been written yet
+            if offset == 0 and e.errno in _ZERO_COPY_UNSUPPORTED_ERRNOS:
+                return False
+            raise
+
+        if n_sent == 0:
+            # Some filesystems report nothing copied even though the file is not empty
+            if offset == 0:
+                return False
+            break
+        offset += n_sent
+
+    return True
+
+def copyfile(src: Path, dst: Path) -> Path:
+    """
+    As :func:`shutil.copyfile`, but avoids copying the data in user space where the platform supports it:
+    the destination is cloned from the source (as in `cp --reflink=auto`) if the filesystem allows it;
+    otherwise, the data is copied within the kernel via `copy_file_range` or `sendfile`.
+    """
+    in_fd = os.open(src, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        src_stat = os.fstat(in_fd)
+        # Check this before the destination is truncated
+        if os.path.exists(dst) and os.path.samestat(src_stat, os.stat(dst)):
+            raise shutil.SameFileError(f'{src!r} and {dst!r} are the same file')
+
+        size = src_stat.st_size
+        out_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            if _reflink(in_fd, out_fd) or _copy_file_range(in_fd, out_fd, size) or _sendfile(in_fd, out_fd, size):
+                return dst
+        finally:
+            os.close(out_fd)
+    finally:
+        os.close(in_fd)
+
+    shutil.copyfile(src, dst)
+    return dst
@@ -1,15 +1,39 @@
 from __future__ import annotations
 
 from collections.abc import Collection
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import threading
 from typing import Callable, TypeVar
 
-from pqdm.processes import pqdm as pqdm_mp
-from pqdm.threads import pqdm as pqdm_mt
+from tqdm import tqdm
 
-__all__ = ['map_mt_with_tqdm']
+__all__ = ['get_executor', 'map_mp_with_tqdm', 'map_mt_with_tqdm']
 
 T, R = TypeVar('T'), TypeVar('R')
 
+_executor: ThreadPoolExecutor | None = None
+_executor_n_jobs = 0
+_executor_lock = threading.Lock()
+
+def get_executor(n_jobs: int) -> ThreadPoolExecutor:
+    """
+    Gets the thread pool shared by this module, which has at least `n_jobs` threads.
+
+    The pool is reused across calls so that the threads do not have to be recreated each time.
+    """
+    global _executor, _executor_n_jobs
+
+    with _executor_lock:
+        if _executor is None or n_jobs > _executor_n_jobs:
+            if _executor is not None:
+                # Any tasks that are still running are allowed to finish
+                _executor.shutdown(wait=False)
+
+            _executor = ThreadPoolExecutor(max_workers=n_jobs)
+            _executor_n_jobs = n_jobs
+
+        return _executor
+
 def map_mp_with_tqdm(
     arr: Collection[T],
     fn: Callable[[T], R],
@@ -25,15 +49,18 @@ def map_mp_with_tqdm(
 
     Returns a list where the `i`th element corresponds to the return value
     of the `i`th execution (i.e., invoking `fn` with arguments `arr[i]`).
+
+    Both `fn` and the elements of `arr` must be picklable.
     """
-    return pqdm_mp(
-        arr,
-        fn,
-        n_jobs=n_jobs,
-        exception_behaviour='immediate',
-        desc=desc,
-        total=len(arr),
-    )
+    # Send the work in batches to amortize the cost of inter-process communication
+    chunksize = max(1, len(arr) // (n_jobs * 4))
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return list(tqdm(
+            executor.map(fn, arr, chunksize=chunksize),
+            desc=desc,
+            total=len(arr),
+        ))
 
 def map_mt_with_tqdm(
     arr: Collection[T],
@@ -50,12 +77,15 @@ def map_mt_with_tqdm(
 
     Returns a list where the `i`th element corresponds to the return value
     of the `i`th execution (i.e., invoking `fn` with arguments `arr[i]`).
+
+    The threads are taken from the shared pool returned by :func:`get_executor`.
+    If any execution raises an exception, it is propagated to the caller
+    and the executions that have yet to start are cancelled.
     """
-    return pqdm_mt(
-        arr,
-        fn,
-        n_jobs=n_jobs,
-        exception_behaviour='immediate',
+    executor = get_executor(n_jobs)
+
+    return list(tqdm(
+        executor.map(fn, arr),
         desc=desc,
         total=len(arr),
-    )
+    ))
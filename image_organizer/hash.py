@@ -1,28 +1,175 @@
 from __future__ import annotations
 
 import hashlib
+import mmap
+import os
 from pathlib import Path
-from typing import Literal
+import sys
+import threading
+from typing import BinaryIO, Literal
 
+from .func import get_executor
 from .logger import get_logger
 
-__all__ = ['compute_hash']
+__all__ = ['HashMethod', 'DEFAULT_CHUNK_SIZE', 'check_hash_method', 'compute_hash', 'compute_hash_chunked']
 
 logger = get_logger()
 
-def compute_hash(img_path: Path, *, hash_method: Literal['sha256', 'sha512']) -> str:
+HashMethod = Literal['sha256', 'sha512', 'blake3']
+
+_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+DEFAULT_CHUNK_SIZE = 8 << 20  # 8 MiB
+
+# Each worker thread reuses its own buffer across files
+_local = threading.local()
+
+def _get_buffer() -> memoryview:
+    buffer: memoryview | None = getattr(_local, 'buffer', None)
+    if buffer is None:
+        buffer = _local.buffer = memoryview(bytearray(_BUFFER_SIZE))
+
+    return buffer
+
+def _import_blake3():
+    try:
+        from blake3 import blake3
+    except ImportError as e:
+        raise ImportError('BLAKE3 hashing requires the `blake3` package. '
+                          'Run `python -m pip install blake3` to install it.') from e
+
+    return blake3
+
+def check_hash_method(hash_method: HashMethod) -> None:
     """
-    Computes the hash from an image file.
+    Checks whether the packages required by a hash method are installed,
+    raising :class:`ImportError` if that is not the case.
     """
-    if hash_method == 'sha256':
-        hasher = hashlib.sha256()
-    elif hash_method == 'sha512':
-        hasher = hashlib.sha512()
+    if hash_method == 'blake3':
+        _import_blake3()
+
+def _new_hasher(hash_method: HashMethod):
+    if hash_method == 'blake3':
+        return _import_blake3()()
+
+    # The hash is only used to compare file contents, which allows it on FIPS-restricted systems as well
+    if sys.version_info >= (3, 9):
+        return hashlib.new(hash_method, usedforsecurity=False)
+
+    return hashlib.new(hash_method)
+
+def _file_digest(f: BinaryIO, hasher):
+    if sys.version_info >= (3, 11):
+        # The read/update loop runs in C
+        return hashlib.file_digest(f, lambda: hasher)
+
+    buffer = _get_buffer()
+    while True:
+        n_read = f.readinto(buffer)
+        if not n_read:
+            break
+
+        hasher.update(buffer[:n_read])
+
+    return hasher
+
+def _mmap_digest(f: BinaryIO, hasher):
+    # Memory-mapping an empty file is not allowed
+    if os.fstat(f.fileno()).st_size == 0:
+        return hasher
 
     try:
-        hasher.update(img_path.read_bytes())
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Not every file can be memory-mapped (e.g., on some network filesystems)
+        return _file_digest(f, hasher)
+
+    with mm:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+
+        # The hasher reads directly from the page cache without copying the data into a buffer first
+        hasher.update(mm)
+
+    return hasher
+
+def compute_hash(img_path: Path, *, hash_method: HashMethod) -> bytes | None:
+    """
+    Computes the hash (as raw bytes) from an image file.
+    Returns `None` if the file cannot be read.
+
+    The file is memory-mapped where possible; otherwise, it is read in fixed-size blocks.
+    Either way, memory usage does not grow with the file size.
+    """
+    hasher = _new_hasher(hash_method)
+
+    try:
+        with img_path.open('rb', buffering=0) as f:
+            hasher = _mmap_digest(f, hasher)
+    except Exception:
+        logger.warning('File (%s) cannot be opened as an image.', img_path, exc_info=True)
+        return None
+
+    return hasher.digest()
+
+def compute_hash_chunked(
+    img_path: Path,
+    *,
+    hash_method: HashMethod,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    n_jobs: int,
+) -> bytes | None:
+    """
+    Computes the hash (as raw bytes) from an image file by splitting it into chunks
+    which are hashed in parallel using multithreading, then hashing the combined digests
+    of the chunks. Returns `None` if the file cannot be read.
+
+    This is useful for large files, which would otherwise be hashed by only one thread.
+    Note that the result is different from that of :func:`compute_hash`, so
+    it should only be compared against other results of this function
+    (with the same `hash_method` and `chunk_size`).
+    """
+    hasher = _new_hasher(hash_method)
+
+    try:
+        with img_path.open('rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # Memory-mapping an empty file is not allowed
+            if size == 0:
+                return hasher.digest()
+
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Not every file can be memory-mapped (e.g., on some network filesystems),
+                # in which case each chunk is read in fixed-size blocks instead
+                def hash_chunk(start: int) -> bytes:
+                    chunk_hasher = _new_hasher(hash_method)
+                    offset, end = start, min(start + chunk_size, size)
+                    while offset < end:
+                        block = os.pread(f.fileno(), min(_BUFFER_SIZE, end - offset), offset)
+                        if not block:
+                            break
+
+                        chunk_hasher.update(block)
+                        offset += len(block)
+
+                    return chunk_hasher.digest()
+
+                chunk_digests = list(get_executor(n_jobs).map(hash_chunk, range(0, size, chunk_size)))
+            else:
+                with mm, memoryview(mm) as mv:
+                    def hash_mapped_chunk(start: int) -> bytes:
+                        chunk_hasher = _new_hasher(hash_method)
+                        with mv[start:start + chunk_size] as chunk:
+                            chunk_hasher.update(chunk)
+
+                        return chunk_hasher.digest()
+
+                    chunk_digests = list(get_executor(n_jobs).map(hash_mapped_chunk, range(0, size, chunk_size)))
     except Exception:
         logger.warning('File (%s) cannot be opened as an image.', img_path, exc_info=True)
-        return ''
+        return None
 
-    return hasher.hexdigest()
+    hasher.update(b''.join(chunk_digests))
+    return hasher.digest()
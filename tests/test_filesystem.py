@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import shutil
+
+import pytest
+
+from image_organizer.filesystem import copyfile, index_images_parallel
+
+def test_copyfile(tmp_path: Path):
+    src, dst = tmp_path / 'src.jpg', tmp_path / 'dst.jpg'
+    src.write_bytes(os.urandom(1 << 20))
+
+    assert copyfile(src, dst) == dst
+    assert dst.read_bytes() == src.read_bytes()
+
+def test_copyfile_empty(tmp_path: Path):
+    src, dst = tmp_path / 'src.jpg', tmp_path / 'dst.jpg'
+    src.write_bytes(b'')
+
+    copyfile(src, dst)
+    assert dst.read_bytes() == b''
+
+def test_copyfile_overwrite(tmp_path: Path):
+    src, dst = tmp_path / 'src.jpg', tmp_path / 'dst.jpg'
+    src.write_bytes(b'new')
+    dst.write_bytes(b'old content')
+
+    copyfile(src, dst)
+    assert dst.read_bytes() == b'new'
+
+def test_copyfile_same_file(tmp_path: Path):
+    src = tmp_path / 'src.jpg'
+    src.write_bytes(b'hello')
+
+    with pytest.raises(shutil.SameFileError):
+        copyfile(src, src)
+
+    assert src.read_bytes() == b'hello'
+
+def test_copyfile_zero_copied(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    src, dst = tmp_path / 'src.jpg', tmp_path / 'dst.jpg'
+    src.write_bytes(b'hello')
+
+    # Simulate filesystems that report nothing copied even though the file is not empty
+    monkeypatch.setattr(os, 'copy_file_range', lambda *args: 0, raising=False)
+    monkeypatch.setattr(os, 'sendfile', lambda *args: 0, raising=False)
+    monkeypatch.setattr(shutil, '_USE_CP_SENDFILE', False, raising=False)
+
+    copyfile(src, dst)
+    assert dst.read_bytes() == b'hello'
+
+@pytest.mark.skipif(not Path('/proc/self/status').exists(), reason='Requires procfs')
+def test_copyfile_procfs(tmp_path: Path):
+    dst = tmp_path / 'status'
+
+    copyfile(Path('/proc/self/status'), dst)
+    assert dst.read_bytes().startswith(b'Name:')
+
+@pytest.mark.parametrize('root', ['.', './', 'src', 'src/'])
+def test_index_images_parallel_rel_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, root: str):
+    (tmp_path / 'src' / 'sub').mkdir(parents=True)
+    (tmp_path / 'src' / 'a.jpg').write_bytes(b'a')
+    (tmp_path / 'src' / 'sub' / 'b.jpg').write_bytes(b'bb')
+    (tmp_path / 'src' / 'sub' / 'c.txt').write_bytes(b'c')
+
+    monkeypatch.chdir(tmp_path if root.startswith('src') else tmp_path / 'src')
+    img_index = index_images_parallel(Path(root), n_jobs=2)
+
+    assert img_index.rel_paths == [Path('a.jpg'), Path('sub/b.jpg')]
+    assert img_index.rel_paths == [path.relative_to(root) for path in img_index.paths]
+    assert list(img_index.sizes) == [1, 2]